@@ -1,12 +1,97 @@
+import os
 import json
+import base64
+import logging
+import functools
 import boto3
 import uuid
 from datetime import datetime, timezone, timedelta
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
+
+# Serialização JSON: usa orjson (implementação em C) quando empacotado no
+# deploy/layer; caso contrário cai no json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps(data):
+    if orjson:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
+
+def json_loads(text):
+    if orjson:
+        return orjson.loads(text)
+    return json.loads(text)
+
+# Logging: o runtime do Lambda já configura o handler do logger raiz
+# LOG_LEVEL aceita qualquer caixa (debug, INFO...); valor desconhecido vira INFO
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+logger = logging.getLogger()
+logger.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else 'INFO')
+
+# O evento completo só é logado quando LOG_EVENTS=1 (evita serializar
+# alguns KB de JSON para o CloudWatch em toda invocação)
+LOG_EVENTS = os.environ.get('LOG_EVENTS') == '1'
+
+# Fuso horário brasileiro (UTC-3), criado uma única vez por container
+BRAZIL_TZ = timezone(timedelta(hours=-3))
+
+# Atributos lidos do DynamoDB (uuid é palavra reservada, por isso o alias #u)
+TASK_PROJECTION = '#u, description, done, created_at, user_id'
+TASK_PROJECTION_NAMES = {'#u': 'uuid'}
+TASK_KEY_PROJECTION = 'user_id, created_at'  # Só as chaves primárias
+
+# Condição de chave por usuário, montada uma vez e reaproveitada
+@functools.lru_cache(maxsize=1024)
+def user_key_condition(user_id):
+    return Key('user_id').eq(user_id)
+
+# Paginação do GET /tasks
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Headers CORS fixos, montados uma única vez por container
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+    'Content-Type': 'application/json'
+}
+
+# Preflight OPTIONS: normalmente respondido pelo API Gateway (MOCK); esta
+# resposta pronta cobre integrações que ainda encaminham OPTIONS à Lambda
+# (mesmos headers CORS, sem Content-Type e com cache do preflight)
+OPTIONS_RESPONSE = {
+    'statusCode': 200,
+    'headers': {
+        k: v for k, v in CORS_HEADERS.items() if k != 'Content-Type'
+    } | {'Access-Control-Max-Age': '86400'},
+    'body': ''
+}
 
 # Configuração DynamoDB
-dynamodb = boto3.resource('dynamodb')
+# Keep-alive + pool de conexões: invocações "quentes" reaproveitam o socket TLS
+boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=10,
+    retries={'max_attempts': 2, 'mode': 'standard'}
+)
+# Uma única Session por container: a cadeia de credenciais e os modelos
+# de serviço do botocore são resolvidos uma vez só, no INIT
+boto_session = boto3.session.Session()
+dynamodb = boto_session.resource('dynamodb', config=boto_config)
 table = dynamodb.Table('Tasks')
+dynamodb_client = table.meta.client
+
+# Aquecimento: abre a conexão (TCP + TLS + credenciais) ainda no INIT,
+# fora do tempo cobrado da primeira requisição
+try:
+    dynamodb_client.describe_table(TableName='Tasks')
+except Exception as e:
+    logger.warning(f"⚠️ Aquecimento do DynamoDB falhou: {str(e)}")
 
 def lambda_handler(event, context):
     """
@@ -15,9 +100,15 @@ def lambda_handler(event, context):
     - Partition Key: user_id (ex: "user001")
     - Sort Key: created_at (timestamp ISO)
     - Atributos: uuid (UUID), description, done
+    - GSI: uuid-index (Partition Key: uuid) para busca direta por UUID
     """
 
-    print(f"📝 Evento recebido: {json.dumps(event)}")
+    # Preflight CORS: resposta pronta, antes de qualquer outro trabalho
+    if event['httpMethod'] == 'OPTIONS':
+        return OPTIONS_RESPONSE
+
+    if LOG_EVENTS:
+        logger.info(f"📝 Evento recebido: {json.dumps(event)}")
 
     method = event['httpMethod']
     path_params = event.get('pathParameters') or {}
@@ -33,14 +124,15 @@ def lambda_handler(event, context):
         elif method == 'PUT':
             return update_task(event)
         elif method == 'DELETE':
-            return delete_task(event)
-        elif method == 'OPTIONS':
-            return options_response()
+            if path_params.get('uuid'):
+                return delete_task(event)
+            else:
+                return delete_all_tasks(event)
         else:
             return error_response(405, f'Método {method} não permitido')
 
     except Exception as e:
-        print(f"❌ Erro não tratado: {str(e)}")
+        logger.error(f"❌ Erro não tratado: {str(e)}")
         return error_response(500, f'Erro interno: {str(e)}')
 
 def create_task(event):
@@ -48,10 +140,10 @@ def create_task(event):
     ➕ Criar nova task
     POST /tasks
     """
-    print("➕ Criando nova task...")
+    logger.debug("➕ Criando nova task...")
 
     try:
-        body = json.loads(event['body'])
+        body = json_loads(event['body'])
     except:
         return error_response(400, 'JSON inválido no body da requisição')
 
@@ -74,7 +166,7 @@ def create_task(event):
 
     try:
         table.put_item(Item=item)
-        print(f"✅ Task criada: {item['description']} (ID: {task_id})")
+        logger.debug(f"✅ Task criada: {item['description']} (ID: {task_id})")
 
         return success_response(201, {
             'message': '📝 Task criada com sucesso!',
@@ -82,34 +174,69 @@ def create_task(event):
         })
 
     except Exception as e:
-        print(f"❌ Erro ao salvar no DynamoDB: {str(e)}")
+        logger.error(f"❌ Erro ao salvar no DynamoDB: {str(e)}")
         return error_response(500, f'Erro ao salvar task: {str(e)}')
 
 def list_tasks(event):
     """
     📋 Listar tasks do usuário com ordenação nativa
-    GET /tasks
+    GET /tasks?limit=50&next_token=...  (ou ?all=true para todas)
+    "total" é a quantidade de tasks desta página, não do usuário inteiro;
+    next_token vem preenchido enquanto houver mais páginas
     """
-    print("📋 Listando tasks do user001...")
+    logger.debug("📋 Listando tasks do user001...")
+
+    query_params = event.get('queryStringParameters') or {}
+
+    query_kwargs = {
+        'KeyConditionExpression': user_key_condition('user001'),
+        'ScanIndexForward': False,  # Ordem decrescente (mais recente primeiro)
+        'ProjectionExpression': TASK_PROJECTION,
+        'ExpressionAttributeNames': TASK_PROJECTION_NAMES
+    }
+
+    # ?all=true lê páginas cheias (até 1 MB cada) e ignora o "limit"
+    fetch_all = query_params.get('all') == 'true'
+    if not fetch_all:
+        try:
+            limit = int(query_params.get('limit') or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            return error_response(400, 'Parâmetro "limit" deve ser um número inteiro')
+
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            return error_response(400, f'Parâmetro "limit" deve estar entre 1 e {MAX_PAGE_SIZE}')
+
+        query_kwargs['Limit'] = limit
+
+    if query_params.get('next_token'):
+        try:
+            query_kwargs['ExclusiveStartKey'] = decode_next_token(query_params['next_token'])
+        except Exception:
+            return error_response(400, 'Parâmetro "next_token" inválido')
 
     try:
-        # Busca todas as tasks do usuário
-        response = table.query(
-            KeyConditionExpression=Key('user_id').eq('user001'),
-            ScanIndexForward=False  # Ordem decrescente (mais recente primeiro)
-        )
+        items = []
 
-        items = response['Items']
+        # Busca uma página (ou todas, seguindo o LastEvaluatedKey)
+        while True:
+            response = table.query(**query_kwargs)
+            items.extend(response['Items'])
 
-        print(f"✅ Encontradas {len(items)} tasks (ordenadas nativamente)")
+            last_key = response.get('LastEvaluatedKey')
+            if not fetch_all or not last_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
+
+        logger.debug(f"✅ Encontradas {len(items)} tasks (ordenadas nativamente)")
 
         return success_response(200, {
-            'tasks': [format_task_response(item) for item in items],
-            'total': len(items)
+            'tasks': list(map(format_task_response, items)),
+            'total': len(items),
+            'next_token': encode_next_token(last_key) if last_key else None
         })
 
     except Exception as e:
-        print(f"❌ Erro ao listar tasks: {str(e)}")
+        logger.error(f"❌ Erro ao listar tasks: {str(e)}")
         return error_response(500, f'Erro ao listar tasks: {str(e)}')
 
 def get_task_by_uuid(event):
@@ -117,17 +244,24 @@ def get_task_by_uuid(event):
     🔍 Buscar task específica por UUID
     GET /tasks/{uuid}
     """
-    task_id = event['pathParameters']['uuid']
-    print(f"🔍 Buscando task específica: {task_id}")
+    raw_task_id = event['pathParameters']['uuid']
+
+    # UUID malformado não chega a custar uma Query no DynamoDB; as outras
+    # grafias válidas ({...}, urn:uuid:, maiúsculas) viram a forma gravada
+    task_id = canonical_uuid(raw_task_id)
+    if task_id is None:
+        return error_response(400, f'UUID "{raw_task_id}" inválido')
+
+    logger.debug(f"🔍 Buscando task específica: {task_id}")
 
     # Buscar task pelo UUID
     task = find_task_by_id(task_id)
 
     if not task:
-        print(f"❌ Task não encontrada: {task_id}")
+        logger.info(f"❌ Task não encontrada: {task_id}")
         return error_response(404, f'Task "{task_id}" não encontrada')
 
-    print(f"✅ Task encontrada: {task['description']}")
+    logger.debug(f"✅ Task encontrada: {task['description']}")
 
     return success_response(200, {
         'task': format_task_response(task)
@@ -138,11 +272,18 @@ def update_task(event):
     ✏️ Atualizar task existente
     PUT /tasks/{uuid}
     """
-    task_id = event['pathParameters']['uuid']
-    print(f"✏️ Atualizando task: {task_id}")
+    raw_task_id = event['pathParameters']['uuid']
+
+    # UUID malformado não chega a custar uma Query no DynamoDB; as outras
+    # grafias válidas ({...}, urn:uuid:, maiúsculas) viram a forma gravada
+    task_id = canonical_uuid(raw_task_id)
+    if task_id is None:
+        return error_response(400, f'UUID "{raw_task_id}" inválido')
+
+    logger.debug(f"✏️ Atualizando task: {task_id}")
 
     try:
-        body = json.loads(event['body'])
+        body = json_loads(event['body'])
     except:
         return error_response(400, 'JSON inválido no body da requisição')
 
@@ -159,17 +300,35 @@ def update_task(event):
         current_item['done'] = bool(body['done'])
 
     try:
-        table.put_item(Item=current_item)
+        # Atualização condicional: só grava se a task ainda existir
+        table.update_item(
+            Key={
+                'user_id': current_item['user_id'],
+                'created_at': current_item['created_at']
+            },
+            UpdateExpression='SET description = :d, done = :x',
+            ConditionExpression='attribute_exists(#u)',
+            ExpressionAttributeNames={'#u': 'uuid'},
+            ExpressionAttributeValues={
+                ':d': current_item['description'],
+                ':x': current_item['done']
+            }
+        )
 
-        print(f"✅ Task atualizada: {current_item['description']}")
+        logger.debug(f"✅ Task atualizada: {current_item['description']}")
 
         return success_response(200, {
             'message': '✏️ Task atualizada com sucesso!',
             'task': format_task_response(current_item)
         })
 
+    except dynamodb_client.exceptions.ConditionalCheckFailedException:
+        # Task removida entre a busca e a escrita
+        logger.info(f"❌ Task não encontrada: {task_id}")
+        return error_response(404, f'Task "{task_id}" não encontrada')
+
     except Exception as e:
-        print(f"❌ Erro ao atualizar task: {str(e)}")
+        logger.error(f"❌ Erro ao atualizar task: {str(e)}")
         return error_response(500, f'Erro ao atualizar task: {str(e)}')
 
 def delete_task(event):
@@ -177,8 +336,15 @@ def delete_task(event):
     🗑️ Deletar task
     DELETE /tasks/{uuid}
     """
-    task_id = event['pathParameters']['uuid']
-    print(f"🗑️ Deletando task: {task_id}")
+    raw_task_id = event['pathParameters']['uuid']
+
+    # UUID malformado não chega a custar uma Query no DynamoDB; as outras
+    # grafias válidas ({...}, urn:uuid:, maiúsculas) viram a forma gravada
+    task_id = canonical_uuid(raw_task_id)
+    if task_id is None:
+        return error_response(400, f'UUID "{raw_task_id}" inválido')
+
+    logger.debug(f"🗑️ Deletando task: {task_id}")
 
     # Buscar task para pegar as chaves primárias
     current_item = find_task_by_id(task_id)
@@ -189,49 +355,138 @@ def delete_task(event):
 
     try:
         # Deletar usando as chaves primárias (user_id + created_at)
+        # A condição garante que a chave ainda pertence a esta task
         table.delete_item(
             Key={
                 'user_id': current_item['user_id'],
                 'created_at': current_item['created_at']
-            }
+            },
+            ConditionExpression=Attr('uuid').eq(task_id)
         )
 
-        print(f"✅ Task deletada: {task_description}")
+        logger.debug(f"✅ Task deletada: {task_description}")
 
         return success_response(200, {
             'message': f'🗑️ Task "{task_description}" removida com sucesso!',
             'deleted_uuid': task_id
         })
 
+    except dynamodb_client.exceptions.ConditionalCheckFailedException:
+        # Task removida entre a busca e a escrita
+        logger.info(f"❌ Task não encontrada: {task_id}")
+        return error_response(404, f'Task "{task_id}" não encontrada')
+
     except Exception as e:
-        print(f"❌ Erro ao deletar task: {str(e)}")
+        logger.error(f"❌ Erro ao deletar task: {str(e)}")
         return error_response(500, f'Erro ao deletar task: {str(e)}')
 
+def delete_all_tasks(event):
+    """
+    🧹 Deletar todas as tasks do usuário
+    DELETE /tasks
+    """
+    logger.debug("🧹 Deletando todas as tasks do user001...")
+
+    try:
+        deleted_count = batch_delete_user_tasks('user001')
+
+        logger.debug(f"✅ {deleted_count} tasks deletadas")
+
+        return success_response(200, {
+            'message': f'🗑️ {deleted_count} tasks removidas com sucesso!',
+            'deleted_count': deleted_count
+        })
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao deletar tasks: {str(e)}")
+        return error_response(500, f'Erro ao deletar tasks: {str(e)}')
+
+def batch_delete_user_tasks(user_id):
+    """
+    🧹 Remover todas as tasks de um usuário via BatchWriteItem
+    O batch_writer agrupa de 25 em 25 e reenvia os UnprocessedItems
+    """
+    query_kwargs = {
+        'KeyConditionExpression': user_key_condition(user_id),
+        'ProjectionExpression': TASK_KEY_PROJECTION
+    }
+    deleted_count = 0
+
+    with table.batch_writer() as batch:
+        while True:
+            response = table.query(**query_kwargs)
+
+            for item in response['Items']:
+                batch.delete_item(Key={
+                    'user_id': item['user_id'],
+                    'created_at': item['created_at']
+                })
+                deleted_count += 1
+
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return deleted_count
+
 def find_task_by_id(task_id):
     """
     🔍 Buscar task pelo UUID
     """
     try:
         response = table.query(
-            KeyConditionExpression=Key('user_id').eq('user001'),
-            FilterExpression=Attr('uuid').eq(task_id)
+            IndexName='uuid-index',  # GSI com partition key = uuid
+            KeyConditionExpression=Key('uuid').eq(task_id),
+            Limit=1,
+            ProjectionExpression=TASK_PROJECTION,
+            ExpressionAttributeNames=TASK_PROJECTION_NAMES
         )
 
         return response['Items'][0] if response['Items'] else None
 
     except Exception as e:
-        print(f"❌ Erro ao buscar task: {str(e)}")
+        logger.error(f"❌ Erro ao buscar task: {str(e)}")
         return None
 
+def canonical_uuid(value):
+    """
+    🆔 Normalizar o UUID para a forma gravada (minúscula, com hífens)
+    Retorna None se o valor não for um UUID
+    """
+    try:
+        return str(uuid.UUID(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+def encode_next_token(last_evaluated_key):
+    """
+    🔖 Converter LastEvaluatedKey em cursor opaco para o cliente
+    """
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+def decode_next_token(next_token):
+    """
+    🔖 Converter cursor do cliente de volta em ExclusiveStartKey
+    Só aceita a chave primária do próprio usuário (user_id + created_at)
+    """
+    start_key = json.loads(base64.urlsafe_b64decode(next_token.encode()))
+
+    if (not isinstance(start_key, dict)
+            or set(start_key) != {'user_id', 'created_at'}
+            or not all(isinstance(value, str) for value in start_key.values())
+            or start_key['user_id'] != 'user001'):
+        raise ValueError('next_token com formato inválido')
+
+    return start_key
+
 def format_task_response(item):
     """
     🎨 Formatar resposta para o cliente
     Converte UTC para horário brasileiro apenas na apresentação
     """
     # Converter UTC para horário brasileiro (UTC-3)
-    utc_time = datetime.fromisoformat(item['created_at'].replace('Z', '+00:00'))
-    brazil_tz = timezone(timedelta(hours=-3))
-    brazil_time = utc_time.astimezone(brazil_tz)
+    # created_at já é gravado com offset (+00:00) pelo isoformat()
+    brazil_time = datetime.fromisoformat(item['created_at']).astimezone(BRAZIL_TZ)
 
     return {
         'uuid': item['uuid'],
@@ -246,13 +501,8 @@ def success_response(status_code, data):
     """
     return {
         'statusCode': status_code,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-            'Content-Type': 'application/json'
-        },
-        'body': json.dumps(data, default=str)
+        'headers': CORS_HEADERS,
+        'body': json_dumps(data)
     }
 
 def error_response(status_code, message):
@@ -261,29 +511,9 @@ def error_response(status_code, message):
     """
     return {
         'statusCode': status_code,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-            'Content-Type': 'application/json'
-        },
-        'body': json.dumps({
+        'headers': CORS_HEADERS,
+        'body': json_dumps({
             'error': message,
             'timestamp': datetime.now(timezone.utc).isoformat()
         })
     }
-
-def options_response():
-    """
-    🔧 Resposta para requisições OPTIONS (CORS preflight)
-    """
-    return {
-        'statusCode': 200,
-        'headers': {
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-            'Access-Control-Max-Age': '86400'
-        },
-        'body': ''
-    }
@@ -1,6 +1,18 @@
 import json
 import random
 
+# Serialização JSON: usa orjson (implementação em C) quando empacotado no
+# deploy/layer; caso contrário cai no json da biblioteca padrão
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps(data):
+    if orjson:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False)
+
 # Banco de piadas em cache (carregado uma vez por container Lambda)
 PIADAS_POR_TEMA = {
     'programação': [
@@ -54,6 +66,10 @@ PIADAS_POR_TEMA = {
     ]
 }
 
+# Versão imutável (tuplas) do banco, indexada por randrange
+PIADAS_CACHE = {tema: tuple(piadas) for tema, piadas in PIADAS_POR_TEMA.items()}
+PIADAS_PADRAO = PIADAS_CACHE['geral']
+
 def lambda_handler(event, context):
     print("🎭 Iniciando geração de piada mock...")
 
@@ -81,10 +97,10 @@ def lambda_handler(event, context):
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
+            'body': json_dumps({
                 'tema': tema,
                 'piada': piada,
-            }, ensure_ascii=False)
+            })
         }
 
     except Exception as e:
@@ -96,7 +112,7 @@ def lambda_handler(event, context):
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({
+            'body': json_dumps({
                 'erro': 'Erro ao gerar piada',
                 'detalhes': str(e)
             })
@@ -104,8 +120,8 @@ def lambda_handler(event, context):
 
 def gerar_piada_mock(tema):
     """Seleciona piada aleatória do banco em cache"""
-    piadas_tema = PIADAS_POR_TEMA.get(tema.lower(), PIADAS_POR_TEMA['geral'])
-    piada_selecionada = random.choice(piadas_tema)
+    piadas_tema = PIADAS_CACHE.get(tema) or PIADAS_CACHE.get(tema.lower(), PIADAS_PADRAO)
+    piada_selecionada = piadas_tema[random.randrange(len(piadas_tema))]
 
     print(f"🎭 Piada selecionada: {piada_selecionada[:30]}...")
 